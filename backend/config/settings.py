@@ -82,6 +82,13 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # atomic() takes the write lock up front: a deferred transaction that reads
+        # and then writes fails with "database is locked" instead of waiting when
+        # another upload commits in between
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+        # A file rather than the in-memory default, so live-server tests get a
+        # connection per request thread instead of one shared by all of them
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
@@ -0,0 +1,106 @@
+import math
+
+from django.core.paginator import Paginator
+from django.db.models import Q
+
+from .models import EquipmentType, EquipmentName
+
+# ?ordering= value -> model field; prefix with '-' for descending
+ORDERING_FIELDS = {
+    'id': 'id',
+    'equipment_name': 'equipment_name__name',
+    'equipment_type': 'equipment_type__name',
+    'flowrate': 'flowrate',
+    'pressure': 'pressure',
+    'temperature': 'temperature',
+}
+
+RANGE_FIELDS = ['flowrate', 'pressure', 'temperature']
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def _parse_float(params, key):
+    value = params.get(key)
+    if value in (None, ''):
+        return None
+    try:
+        value = float(value)
+    except ValueError:
+        raise ValueError(f"'{key}' must be a number")
+    # float() accepts 'nan' and 'inf', which would silently match nothing
+    if not math.isfinite(value):
+        raise ValueError(f"'{key}' must be a number")
+    return value
+
+
+def _parse_positive_int(params, key, default):
+    value = params.get(key)
+    if value in (None, ''):
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f"'{key}' must be a positive integer")
+    if value < 1:
+        raise ValueError(f"'{key}' must be a positive integer")
+    return value
+
+
+def filter_equipment(queryset, params):
+    """
+    Apply the UploadDataView query parameters to an EquipmentData queryset.
+
+    Supported: type (comma-separated names), <field>_min / <field>_max for
+    flowrate, pressure and temperature, missing=true, search (name substring)
+    and ordering. Raises ValueError on malformed values.
+    """
+    types = [t.strip() for t in params.get('type', '').split(',') if t.strip()]
+    if types:
+        # Resolve names to ids once so the row filter is an integer IN
+        type_ids = list(EquipmentType.objects.filter(name__in=types).values_list('id', flat=True))
+        queryset = queryset.filter(equipment_type_id__in=type_ids)
+
+    for field in RANGE_FIELDS:
+        low = _parse_float(params, f'{field}_min')
+        high = _parse_float(params, f'{field}_max')
+        if low is not None:
+            queryset = queryset.filter(**{f'{field}__gte': low})
+        if high is not None:
+            queryset = queryset.filter(**{f'{field}__lte': high})
+
+    if params.get('missing', 'false').lower() == 'true':
+        queryset = queryset.filter(
+            Q(equipment_name__isnull=True) | Q(equipment_type__isnull=True) |
+            Q(flowrate__isnull=True) | Q(pressure__isnull=True) | Q(temperature__isnull=True)
+        )
+
+    search = params.get('search', '').strip()
+    if search:
+        queryset = queryset.filter(equipment_name_id__in=EquipmentName.objects.search(search).values('id'))
+
+    ordering = params.get('ordering') or 'id'
+    descending = ordering.startswith('-')
+    field = ORDERING_FIELDS.get(ordering.lstrip('-'))
+    if field is None:
+        raise ValueError(f"'ordering' must be one of {list(ORDERING_FIELDS)}, optionally prefixed with '-'")
+    order_by = [f'-{field}' if descending else field]
+    if field != 'id':
+        # Stable order between pages for rows with equal values
+        order_by.append('id')
+    return queryset.order_by(*order_by)
+
+
+def paginate(queryset, params):
+    """Return (page_rows, pagination_info) for ?page= / ?page_size=."""
+    page_size = min(_parse_positive_int(params, 'page_size', DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+    page_number = _parse_positive_int(params, 'page', 1)
+    paginator = Paginator(queryset, page_size)
+    page = paginator.get_page(page_number)
+    return page.object_list, {
+        "count": paginator.count,
+        "page": page.number,
+        "page_size": page_size,
+        "num_pages": paginator.num_pages,
+    }
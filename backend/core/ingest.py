@@ -0,0 +1,68 @@
+"""
+CSV ingest shared by the single and batch upload views.
+
+Parsing lives in .parsing (no Django imports, so it can run in worker
+processes); everything that touches the database stays here in save_upload() /
+trim_history(), which run in the request process.
+"""
+import os
+
+from django.db import connection, transaction
+
+from .models import UploadHistory, EquipmentData, EquipmentType, EquipmentName
+
+# Number of uploads kept in the history; older ones are deleted with their files
+HISTORY_LIMIT = 5
+
+
+def trim_history(keep):
+    """Delete the oldest uploads (database rows AND physical files) so at most `keep` remain."""
+    history_count = UploadHistory.objects.count()
+    if history_count <= keep:
+        return
+    for h in UploadHistory.objects.order_by('uploaded_at')[:history_count - keep]:
+        # Delete the physical file from uploads/ folder
+        if h.file and os.path.exists(h.file.path):
+            os.remove(h.file.path)
+        # Delete the database record
+        h.delete()
+    delete_unused_labels()
+
+
+def delete_unused_labels():
+    """Delete the lookup rows no EquipmentData row references any more."""
+    # Without this the lookup tables (and the name FTS index) would keep every
+    # label ever uploaded, not just those of the uploads still in the history.
+    # One DELETE per table rather than QuerySet.delete(), whose separate
+    # check-then-delete queries race with concurrent uploads reusing a label.
+    data_table = connection.ops.quote_name(EquipmentData._meta.db_table)
+    with connection.cursor() as cursor:
+        for lookup, field in ((EquipmentName, 'equipment_name'), (EquipmentType, 'equipment_type')):
+            column = connection.ops.quote_name(EquipmentData._meta.get_field(field).column)
+            cursor.execute(
+                f"DELETE FROM {connection.ops.quote_name(lookup._meta.db_table)} "
+                f"WHERE id NOT IN (SELECT {column} FROM {data_table} WHERE {column} IS NOT NULL)"
+            )
+
+
+def save_upload(user, filename, file, rows):
+    """Create one UploadHistory entry with its EquipmentData rows, atomically."""
+    with transaction.atomic():
+        history = UploadHistory.objects.create(user=user, filename=filename, file=file)
+
+        # Intern labels into the lookup tables (one query each for the whole file)
+        name_ids = EquipmentName.objects.intern(row[0] for row in rows)
+        type_ids = EquipmentType.objects.intern(row[1] for row in rows)
+
+        EquipmentData.objects.bulk_create([
+            EquipmentData(
+                upload=history,
+                equipment_name_id=name_ids.get(name),
+                equipment_type_id=type_ids.get(equipment_type),
+                flowrate=flowrate,
+                pressure=pressure,
+                temperature=temperature
+            )
+            for name, equipment_type, flowrate, pressure, temperature in rows
+        ])
+    return history
@@ -0,0 +1,413 @@
+"""
+Concurrent-client load generator for the core API.
+
+Each virtual user is a thread with its own keep-alive connection that repeatedly
+runs one of the flows the web and desktop clients perform, picked by weight:
+
+    login      GET history/ on a fresh connection (what Login.jsx does)
+    history    GET history/ (HistorySidebar polling)
+    dashboard  GET history/, then GET data/<id>/ for one of the listed uploads
+    report     GET history/, then GET report/<id>/ (PDF download)
+    upload     POST upload/?confirmed=true with a generated CSV
+
+Usage:
+    python manage.py loadtest --username admin --password secret \\
+        --users 1,5,10,20 --duration 30 --mix history=4,dashboard=3,report=1,upload=1
+
+Every comma-separated user count is run as its own step, so throughput and
+latency can be compared across concurrency levels to find the saturation point.
+Results are printed per endpoint and written as JSON to --output. A 404 for an
+upload that another user's upload just pushed out of the 5-entry history is
+counted as `stale`, not as an error, so it doesn't pass for server saturation.
+
+Runs against an already started server (--url), or starts `manage.py runserver`
+on the URL's port with --runserver. Note that the upload flow writes to the
+server's database and, through the history limit, deletes older uploads.
+"""
+import base64
+import http.client
+import json
+import math
+import random
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+FLOWS = ['login', 'history', 'dashboard', 'report', 'upload']
+DEFAULT_MIX = 'login=1,history=4,dashboard=3,report=1,upload=1'
+PERCENTILES = [50, 90, 95, 99]
+EQUIPMENT_TYPES = ['Pump', 'Compressor', 'Valve', 'HeatExchanger', 'Reactor', 'Condenser']
+
+
+def parse_mix(value):
+    """'history=4,upload=1' -> {'history': 4, 'upload': 1}"""
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in FLOWS:
+            raise CommandError(f"Unknown flow '{name}'. Available: {', '.join(FLOWS)}")
+        try:
+            mix[name] = int(weight) if weight else 1
+        except ValueError:
+            raise CommandError(f"Weight for '{name}' must be an integer")
+    if not any(mix.values()):
+        raise CommandError("--mix needs at least one flow with a positive weight")
+    return mix
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    # The smallest value with at least pct% of the samples at or below it
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def make_csv(rows, rng):
+    lines = ['Equipment Name,Type,Flowrate,Pressure,Temperature']
+    for i in range(rows):
+        equipment_type = rng.choice(EQUIPMENT_TYPES)
+        lines.append(f"{equipment_type}-{i},{equipment_type},{rng.uniform(50, 300):.2f},"
+                     f"{rng.uniform(1, 20):.2f},{rng.uniform(80, 400):.2f}")
+    return '\n'.join(lines).encode()
+
+
+class Recorder:
+    """Thread-safe collection of (endpoint, latency, ok) samples for one step."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_samples = defaultdict(set)
+        self.stale = defaultdict(int)
+
+    def record(self, endpoint, seconds, error=None, stale=False):
+        with self.lock:
+            self.latencies[endpoint].append(seconds * 1000)
+            if error is not None:
+                self.add_error(endpoint, error)
+            elif stale:
+                self.stale[endpoint] += 1
+
+    def record_error(self, endpoint, error):
+        """Count a failure that is not a request of its own (e.g. a crashed flow)."""
+        with self.lock:
+            self.add_error(endpoint, error)
+
+    def add_error(self, endpoint, error):
+        self.errors[endpoint] += 1
+        # Keep a few distinct messages per endpoint for the report
+        if len(self.error_samples[endpoint]) < 5:
+            self.error_samples[endpoint].add(error)
+
+    def summarize(self, elapsed):
+        endpoints = {}
+        for endpoint in sorted(self.latencies.keys() | self.errors.keys()):
+            latencies = sorted(self.latencies[endpoint])
+            count = len(latencies)
+            endpoints[endpoint] = {
+                "requests": count,
+                "errors": self.errors[endpoint],
+                "error_rate": self.errors[endpoint] / count if count else 1.0,
+                "stale": self.stale[endpoint],
+                "throughput_rps": count / elapsed,
+                "latency_ms": {
+                    "mean": sum(latencies) / count if count else None,
+                    **{f"p{pct}": percentile(latencies, pct) for pct in PERCENTILES},
+                    "max": latencies[-1] if count else None,
+                },
+                "error_samples": sorted(self.error_samples[endpoint]),
+            }
+        total = sum(e["requests"] for e in endpoints.values())
+        errors = sum(e["errors"] for e in endpoints.values())
+        return {
+            "elapsed_s": elapsed,
+            "requests": total,
+            "errors": errors,
+            "error_rate": errors / total if total else float(errors > 0),
+            "throughput_rps": total / elapsed,
+            "endpoints": endpoints,
+        }
+
+
+class Client:
+    """One virtual user: a keep-alive HTTP connection with Basic auth, like the web client."""
+
+    def __init__(self, url, username, password, recorder, timeout):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port
+        self.https = parts.scheme == 'https'
+        self.prefix = parts.path.rstrip('/') + '/'
+        self.recorder = recorder
+        self.timeout = timeout
+        token = base64.b64encode(f"{username}:{password}".encode()).decode()
+        self.headers = {'Authorization': f'Basic {token}'}
+        self.connection = None
+
+    def connect(self):
+        connection_class = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        self.connection = connection_class(self.host, self.port, timeout=self.timeout)
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def request(self, endpoint, method, path, body=None, headers=None, decode=None, stale_if_missing=False):
+        """
+        Send one request and record it under `endpoint`; returns the body, or None on error.
+
+        With `decode`, returns decode(body) instead, and a body it fails on is
+        recorded as an error of this request. With `stale_if_missing`, a 404 is
+        recorded as stale (the upload was trimmed meanwhile) rather than an error.
+        """
+        if self.connection is None:
+            self.connect()
+        started = time.perf_counter()
+        try:
+            self.connection.request(method, self.prefix + path, body=body, headers={**self.headers, **(headers or {})})
+            response = self.connection.getresponse()
+            payload = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            self.recorder.record(endpoint, time.perf_counter() - started, f"{type(e).__name__}: {e}")
+            # Start over on a new connection after any transport error
+            self.close()
+            return None
+        elapsed = time.perf_counter() - started
+        if response.status == 404 and stale_if_missing:
+            self.recorder.record(endpoint, elapsed, stale=True)
+            return None
+        if response.status >= 400:
+            # Include the start of the body so distinct failures stay distinguishable
+            detail = payload[:120].decode(errors='replace') if response.getheader('Content-Type', '').startswith('application/json') else ''
+            self.recorder.record(endpoint, elapsed, f"HTTP {response.status} {detail}".strip())
+            return None
+        if decode is not None:
+            try:
+                payload = decode(payload)
+            except Exception as e:
+                self.recorder.record(endpoint, elapsed, f"Bad response: {type(e).__name__}: {e}")
+                return None
+        self.recorder.record(endpoint, elapsed)
+        return payload
+
+
+class VirtualUser(threading.Thread):
+    def __init__(self, client, mix, deadline, think_time, upload_rows, seed):
+        super().__init__(daemon=True)
+        self.client = client
+        self.flows = list(mix)
+        self.weights = [mix[flow] for flow in self.flows]
+        self.deadline = deadline
+        self.think_time = think_time
+        self.upload_rows = upload_rows
+        self.rng = random.Random(seed)
+        self.upload_ids = []
+
+    def run(self):
+        try:
+            while time.monotonic() < self.deadline:
+                flow = self.rng.choices(self.flows, self.weights)[0]
+                try:
+                    getattr(self, f'flow_{flow}')()
+                except Exception as e:
+                    # Keep the user running; a dead thread would just lower the load
+                    self.client.recorder.record_error(f'{flow} flow', f"{type(e).__name__}: {e}")
+                    self.client.close()
+                if self.think_time:
+                    time.sleep(self.rng.uniform(0, 2 * self.think_time))
+        finally:
+            self.client.close()
+
+    def fetch_history(self):
+        upload_ids = self.client.request('history/', 'GET', 'history/',
+                                         decode=lambda body: [entry['id'] for entry in json.loads(body)])
+        if upload_ids is not None:
+            self.upload_ids = upload_ids
+
+    def pick_upload(self):
+        if not self.upload_ids:
+            self.fetch_history()
+        return self.rng.choice(self.upload_ids) if self.upload_ids else None
+
+    def flow_login(self):
+        self.client.close()
+        self.fetch_history()
+
+    def flow_history(self):
+        self.fetch_history()
+
+    def flow_dashboard(self):
+        self.fetch_history()
+        self.fetch_upload('data/<id>/', 'data/{}/')
+
+    def flow_report(self):
+        # Refresh first: cached ids go stale as other users' uploads trim the history
+        self.fetch_history()
+        self.fetch_upload('report/<id>/', 'report/{}/')
+
+    def fetch_upload(self, endpoint, path):
+        upload_id = self.pick_upload()
+        if upload_id is None:
+            return
+        # Another user's upload can still trim it between the two requests
+        if self.client.request(endpoint, 'GET', path.format(upload_id), stale_if_missing=True) is None:
+            self.upload_ids = []
+
+    def flow_upload(self):
+        boundary = uuid.uuid4().hex
+        body = (
+            f'--{boundary}\r\n'
+            f'Content-Disposition: form-data; name="file"; filename="loadtest_{boundary[:8]}.csv"\r\n'
+            f'Content-Type: text/csv\r\n\r\n'
+        ).encode() + make_csv(self.upload_rows, self.rng) + f'\r\n--{boundary}--\r\n'.encode()
+        payload = self.client.request('upload/', 'POST', 'upload/?confirmed=true', body=body,
+                                      headers={'Content-Type': f'multipart/form-data; boundary={boundary}'})
+        if payload is not None:
+            # Older uploads may just have been trimmed from the history
+            self.upload_ids = []
+
+
+class Command(BaseCommand):
+    help = "Run concurrent virtual users against a running API server and report per-endpoint latency, throughput and errors."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000/api/', help="API base URL (default: %(default)s)")
+        parser.add_argument('--username', required=True)
+        parser.add_argument('--password', required=True)
+        parser.add_argument('--users', default='10',
+                            help="Concurrent users; a comma-separated list runs one step per value (default: %(default)s)")
+        parser.add_argument('--duration', type=float, default=30, help="Seconds per step (default: %(default)s)")
+        parser.add_argument('--mix', default=DEFAULT_MIX, help="Flow weights (default: %(default)s)")
+        parser.add_argument('--think-time', type=float, default=0,
+                            help="Mean pause between flows per user, in seconds (default: %(default)s)")
+        parser.add_argument('--upload-rows', type=int, default=200, help="Rows per generated CSV (default: %(default)s)")
+        parser.add_argument('--timeout', type=float, default=60, help="Per-request timeout in seconds (default: %(default)s)")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='loadtest-results.json', help="JSON results file (default: %(default)s)")
+        parser.add_argument('--runserver', action='store_true',
+                            help="Start `manage.py runserver` on the URL's port for the duration of the run")
+
+    def handle(self, *args, **options):
+        mix = parse_mix(options['mix'])
+        try:
+            user_steps = [int(value) for value in options['users'].split(',')]
+        except ValueError:
+            raise CommandError("--users must be an integer or a comma-separated list of integers")
+        if any(users < 1 for users in user_steps):
+            raise CommandError("--users values must be positive")
+
+        started_at = datetime.now(timezone.utc).isoformat()
+        server = self.start_server(options['url']) if options['runserver'] else None
+        try:
+            self.preflight(options, mix)
+            steps = [self.run_step(users, mix, options) for users in user_steps]
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+        results = {
+            "started_at": started_at,
+            "config": {
+                "url": options['url'],
+                "users": user_steps,
+                "duration_s": options['duration'],
+                "mix": mix,
+                "think_time_s": options['think_time'],
+                "upload_rows": options['upload_rows'],
+                "runserver": options['runserver'],
+            },
+            "steps": steps,
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(results, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def start_server(self, url):
+        parts = urlsplit(url)
+        address = f"{parts.hostname}:{parts.port or 80}"
+        server = subprocess.Popen(
+            [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'runserver', address, '--noreload'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f"runserver exited with code {server.returncode}")
+            connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=1)
+            try:
+                connection.request('GET', parts.path)
+                connection.getresponse().read()
+                self.stdout.write(f"Started runserver on {address}")
+                return server
+            except OSError:
+                time.sleep(0.2)
+            finally:
+                connection.close()
+        server.terminate()
+        raise CommandError(f"runserver did not start listening on {address} within 30s")
+
+    def preflight(self, options, mix):
+        """Check the credentials, and make sure data/report flows have an upload to read."""
+        recorder = Recorder()
+        user = VirtualUser(Client(options['url'], options['username'], options['password'], recorder, options['timeout']),
+                           mix, 0, 0, options['upload_rows'], options['seed'])
+        user.fetch_history()
+        if recorder.errors:
+            raise CommandError(f"Cannot reach {options['url']}history/ as {options['username']}: "
+                               f"{', '.join(recorder.error_samples['history/'])}")
+        if not user.upload_ids and (mix.get('dashboard') or mix.get('report')):
+            self.stdout.write("No uploads yet; seeding one so the data/report flows have something to fetch")
+            user.flow_upload()
+            if recorder.errors.get('upload/'):
+                raise CommandError(f"Seed upload failed: {', '.join(recorder.error_samples['upload/'])}")
+        user.client.close()
+
+    def run_step(self, users, mix, options):
+        self.stdout.write(f"\n== {users} users for {options['duration']:g}s ==")
+        recorder = Recorder()
+        started = time.monotonic()
+        deadline = started + options['duration']
+        threads = [
+            VirtualUser(Client(options['url'], options['username'], options['password'], recorder, options['timeout']),
+                        mix, deadline, options['think_time'], options['upload_rows'], options['seed'] + i)
+            for i in range(users)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Users finish their in-flight flow after the deadline, so measure the real span
+        step = {"users": users, **recorder.summarize(time.monotonic() - started)}
+        self.print_step(step)
+        return step
+
+    def print_step(self, step):
+        header = f"{'endpoint':<14}{'reqs':>8}{'rps':>9}{'err%':>7}{'mean':>9}" + ''.join(f"{'p' + str(p):>9}" for p in PERCENTILES) + f"{'max':>9}"
+        self.stdout.write(header)
+        for endpoint, stats in step['endpoints'].items():
+            latency = stats['latency_ms']
+            columns = [latency['mean'], *(latency[f'p{p}'] for p in PERCENTILES), latency['max']]
+            self.stdout.write(
+                f"{endpoint:<14}{stats['requests']:>8}{stats['throughput_rps']:>9.1f}{stats['error_rate'] * 100:>6.1f}%"
+                # Flows that crashed outside a request have no latency samples
+                + ''.join(f"{value:>9.1f}" if value is not None else f"{'-':>9}" for value in columns)
+            )
+            for sample in stats['error_samples']:
+                self.stdout.write(self.style.WARNING(f"    {sample}"))
+            if stats['stale']:
+                self.stdout.write(f"    {stats['stale']} stale: 404 for an upload trimmed from the history")
+        self.stdout.write(f"{'total':<14}{step['requests']:>8}{step['throughput_rps']:>9.1f}{step['error_rate'] * 100:>6.1f}%")
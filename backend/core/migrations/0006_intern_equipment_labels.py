@@ -0,0 +1,70 @@
+from django.db import migrations
+from django.db.models import Case, OuterRef, Subquery, Value, When
+
+# Frozen copy of core/parsing.py: labels must be interned exactly as a new
+# upload of the same value would be
+NULL_SENTINELS = {'', 'nan', 'none', 'null', 'n/a'}
+
+
+def _normalize(value):
+    value = value.strip()
+    return None if value.lower() in NULL_SENTINELS else value
+
+
+def _chunks(items, size=500):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _intern(EquipmentData, Lookup, field):
+    # Set-based: normalize the distinct labels in Python (SQL TRIM() only strips
+    # spaces, str.strip() all whitespace), bulk insert them into the lookup table,
+    # then resolve the rows with as few UPDATEs as possible. Sentinel labels have
+    # no lookup row and end up NULL.
+    raw_labels = EquipmentData.objects.exclude(**{f'{field}__isnull': True}) \
+                                      .order_by() \
+                                      .values_list(field, flat=True).distinct()
+    labels = {raw: _normalize(raw) for raw in raw_labels}
+    Lookup.objects.bulk_create([Lookup(name=label) for label in set(labels.values()) - {None}],
+                               batch_size=1000, ignore_conflicts=True)
+
+    # Labels that are already clean (nearly all of them): one UPDATE through the
+    # lookup's unique name index
+    EquipmentData.objects.update(**{f'{field}_ref': Subquery(
+        Lookup.objects.filter(name=OuterRef(field)).values('id')[:1]
+    )})
+
+    # Labels with surrounding whitespace: one CASE UPDATE per chunk of values
+    dirty = {raw: label for raw, label in labels.items() if label is not None and label != raw}
+    for chunk in _chunks(dirty):
+        ids = dict(Lookup.objects.filter(name__in={dirty[raw] for raw in chunk}).values_list('name', 'id'))
+        EquipmentData.objects.filter(**{f'{field}__in': chunk}).update(**{f'{field}_ref': Case(
+            *[When(**{field: raw}, then=Value(ids[dirty[raw]])) for raw in chunk]
+        )})
+
+
+def intern_labels(apps, schema_editor):
+    EquipmentData = apps.get_model('core', 'EquipmentData')
+    _intern(EquipmentData, apps.get_model('core', 'EquipmentName'), 'equipment_name')
+    _intern(EquipmentData, apps.get_model('core', 'EquipmentType'), 'equipment_type')
+
+
+def restore_labels(apps, schema_editor):
+    EquipmentData = apps.get_model('core', 'EquipmentData')
+    for field, Lookup in (('equipment_name', apps.get_model('core', 'EquipmentName')),
+                          ('equipment_type', apps.get_model('core', 'EquipmentType'))):
+        EquipmentData.objects.update(**{field: Subquery(
+            Lookup.objects.filter(id=OuterRef(f'{field}_ref')).values('name')[:1]
+        )})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_equipmenttype_equipmentname'),
+    ]
+
+    operations = [
+        migrations.RunPython(intern_labels, restore_labels),
+    ]
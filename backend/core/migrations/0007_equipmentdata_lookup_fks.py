@@ -0,0 +1,41 @@
+# Generated by Django 6.0.2 on 2026-10-19 09:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_intern_equipment_labels'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='equipmentdata',
+            name='equipment_name',
+        ),
+        migrations.RemoveField(
+            model_name='equipmentdata',
+            name='equipment_type',
+        ),
+        migrations.RenameField(
+            model_name='equipmentdata',
+            old_name='equipment_name_ref',
+            new_name='equipment_name',
+        ),
+        migrations.RenameField(
+            model_name='equipmentdata',
+            old_name='equipment_type_ref',
+            new_name='equipment_type',
+        ),
+        migrations.AlterField(
+            model_name='equipmentdata',
+            name='upload',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='equipment_data', to='core.uploadhistory'),
+        ),
+        migrations.AddIndex(
+            model_name='equipmentdata',
+            index=models.Index(fields=['upload', 'equipment_type'], name='core_equip_upload_type_idx'),
+        ),
+    ]
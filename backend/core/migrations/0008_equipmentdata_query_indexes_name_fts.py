@@ -0,0 +1,73 @@
+import sqlite3
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# The triggers live on core_equipmentname. Django's SQLite schema editor drops them
+# whenever it rebuilds that table (most AlterField/RemoveField operations), so a
+# later migration that alters EquipmentName must run these statements again.
+FTS_FORWARD = [
+    "CREATE VIRTUAL TABLE core_equipmentname_fts USING fts5("
+    "name, content='core_equipmentname', content_rowid='id', tokenize='trigram')",
+    "INSERT INTO core_equipmentname_fts(core_equipmentname_fts) VALUES ('rebuild')",
+    "CREATE TRIGGER core_equipmentname_fts_ai AFTER INSERT ON core_equipmentname BEGIN "
+    "INSERT INTO core_equipmentname_fts(rowid, name) VALUES (new.id, new.name); END",
+    "CREATE TRIGGER core_equipmentname_fts_ad AFTER DELETE ON core_equipmentname BEGIN "
+    "INSERT INTO core_equipmentname_fts(core_equipmentname_fts, rowid, name) VALUES ('delete', old.id, old.name); END",
+    "CREATE TRIGGER core_equipmentname_fts_au AFTER UPDATE ON core_equipmentname BEGIN "
+    "INSERT INTO core_equipmentname_fts(core_equipmentname_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+    "INSERT INTO core_equipmentname_fts(rowid, name) VALUES (new.id, new.name); END",
+]
+
+FTS_BACKWARD = [
+    "DROP TRIGGER IF EXISTS core_equipmentname_fts_au",
+    "DROP TRIGGER IF EXISTS core_equipmentname_fts_ad",
+    "DROP TRIGGER IF EXISTS core_equipmentname_fts_ai",
+    "DROP TABLE IF EXISTS core_equipmentname_fts",
+]
+
+
+def _supports_trigram(schema_editor):
+    # Other backends and older SQLite fall back to icontains; core.models.has_name_fts()
+    # checks for the table itself at runtime
+    return schema_editor.connection.vendor == 'sqlite' and sqlite3.sqlite_version_info >= (3, 34, 0)
+
+
+def create_name_fts(apps, schema_editor):
+    if _supports_trigram(schema_editor):
+        for sql in FTS_FORWARD:
+            schema_editor.execute(sql)
+
+
+def drop_name_fts(apps, schema_editor):
+    if _supports_trigram(schema_editor):
+        for sql in FTS_BACKWARD:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_equipmentdata_lookup_fks'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='equipmentdata',
+            name='upload',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='equipment_data', to='core.uploadhistory'),
+        ),
+        migrations.AddIndex(
+            model_name='equipmentdata',
+            index=models.Index(fields=['upload', 'equipment_name'], name='core_equip_upload_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipmentdata',
+            index=models.Index(fields=['upload', 'flowrate'], name='core_equip_upload_flow_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipmentdata',
+            index=models.Index(fields=['upload', 'temperature'], name='core_equip_upload_temp_idx'),
+        ),
+        migrations.RunPython(create_name_fts, drop_name_fts),
+    ]
@@ -1,6 +1,76 @@
-from django.db import models
+from django.db import models, connection
+from django.db.models.expressions import RawSQL
 from django.contrib.auth.models import User
 
+
+class LookupManager(models.Manager):
+    def intern(self, names):
+        """Return a {name: id} map for the given names, creating any missing rows."""
+        names = {name for name in names if name is not None}
+        if not names:
+            return {}
+        existing = dict(self.filter(name__in=names).values_list('name', 'id'))
+        missing = names - existing.keys()
+        if missing:
+            self.bulk_create([self.model(name=name) for name in missing], ignore_conflicts=True)
+            existing.update(self.filter(name__in=missing).values_list('name', 'id'))
+        return existing
+
+
+# Database NAME -> whether core_equipmentname_fts exists there
+_name_fts_tables = {}
+
+
+def has_name_fts():
+    """
+    Whether the trigram FTS5 index over equipment names exists in this database.
+
+    Checked once per database rather than inferred from the SQLite library version,
+    which may differ from the one the database was migrated (or restored) under.
+    """
+    if connection.vendor != 'sqlite':
+        return False
+    key = connection.settings_dict['NAME']
+    if key not in _name_fts_tables:
+        _name_fts_tables[key] = 'core_equipmentname_fts' in connection.introspection.table_names()
+    return _name_fts_tables[key]
+
+
+class EquipmentNameManager(LookupManager):
+    def search(self, term):
+        """Names containing term (case-insensitive), via the FTS5 trigram index when available."""
+        term = term.strip()
+        # Trigram matching needs at least three characters
+        if not has_name_fts() or len(term) < 3:
+            return self.filter(name__icontains=term)
+        match = '"' + term.replace('"', '""') + '"'
+        return self.filter(id__in=RawSQL(
+            "SELECT rowid FROM core_equipmentname_fts WHERE core_equipmentname_fts MATCH %s", [match]
+        ))
+
+
+class EquipmentType(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+
+    objects = LookupManager()
+
+    def __str__(self):
+        return self.name
+
+
+class EquipmentName(models.Model):
+    # On SQLite, migration 0008 keeps core_equipmentname_fts in sync through AFTER
+    # INSERT/UPDATE/DELETE triggers on this table. Django's SQLite schema editor
+    # rebuilds the table for most AlterField/RemoveField operations and drops the
+    # triggers silently: any such migration must recreate them.
+    name = models.CharField(max_length=255, unique=True)
+
+    objects = EquipmentNameManager()
+
+    def __str__(self):
+        return self.name
+
+
 class UploadHistory(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
@@ -11,12 +81,26 @@ class UploadHistory(models.Model):
         return f"{self.filename} - {self.uploaded_at}"
 
 class EquipmentData(models.Model):
+    # Indexed on its own too: (upload_id, rowid) serves the default id ordering
     upload = models.ForeignKey(UploadHistory, on_delete=models.CASCADE, related_name='equipment_data')
-    equipment_name = models.CharField(max_length=255, null=True, blank=True)
-    equipment_type = models.CharField(max_length=100, null=True, blank=True)
+    equipment_name = models.ForeignKey(EquipmentName, on_delete=models.PROTECT, null=True, blank=True, related_name='+', db_index=False)
+    equipment_type = models.ForeignKey(EquipmentType, on_delete=models.PROTECT, null=True, blank=True, related_name='+', db_index=False)
     flowrate = models.FloatField(null=True, blank=True)
     pressure = models.FloatField(null=True, blank=True)
     temperature = models.FloatField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Serves the per-upload type distribution as an integer group-by
+            models.Index(fields=['upload', 'equipment_type'], name='core_equip_upload_type_idx'),
+            # Name search: resolves the equipment_name_id IN (...) list from the FTS lookup.
+            # It does not help ordering=equipment_name, which sorts on the joined name.
+            models.Index(fields=['upload', 'equipment_name'], name='core_equip_upload_name_idx'),
+            # Flowrate range filters and flowrate/temperature sorting within one upload.
+            # There is no pressure index: none of the measured queries used one.
+            models.Index(fields=['upload', 'flowrate'], name='core_equip_upload_flow_idx'),
+            models.Index(fields=['upload', 'temperature'], name='core_equip_upload_temp_idx'),
+        ]
+
     def __str__(self):
-        return self.equipment_name
+        return self.equipment_name.name if self.equipment_name_id else ''
@@ -0,0 +1,81 @@
+"""
+Equipment CSV parsing, kept free of Django imports.
+
+The batch upload view runs parse_equipment_csv() in a `spawn` process pool,
+whose workers import this module without setting up Django; importing models
+(or anything that does) here would fail there with AppRegistryNotReady.
+"""
+import io
+import time
+
+REQUIRED_COLUMNS = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+
+# Strings the CSV ingest (or older versions of it) may leave behind for a missing cell
+NULL_SENTINELS = {'', 'nan', 'none', 'null', 'n/a'}
+
+
+class IngestError(ValueError):
+    """The file is readable but not a valid equipment CSV (reported as a 400)."""
+
+
+def normalize_label(value):
+    """Strip a free-text label and map NaN sentinels to None."""
+    if value is None:
+        return None
+    # float('nan') never equals itself
+    if value != value:
+        return None
+    value = str(value).strip()
+    if value.lower() in NULL_SENTINELS:
+        return None
+    return value
+
+
+def parse_equipment_csv(content):
+    """
+    Parse and normalize an equipment CSV given as bytes.
+
+    Returns a dict with the row tuples (name, type, flowrate, pressure,
+    temperature; None for missing values), missing_values_count, the summary
+    sent back to the client and parse_ms.
+    """
+    # pandas/numpy are imported on first upload, not at server start
+    import pandas as pd
+    import numpy as np
+
+    started = time.perf_counter()
+    df = pd.read_csv(io.BytesIO(content))
+    if not all(col in df.columns for col in REQUIRED_COLUMNS):
+        raise IngestError(f"Missing columns. Required: {REQUIRED_COLUMNS}")
+
+    # Treat empty strings and whitespace as NaN first
+    df.replace(r'^\s*$', np.nan, regex=True, inplace=True)
+
+    # Label columns: strip and turn NaN sentinels ('nan', 'null', ...) into real NaN
+    for col in ['Equipment Name', 'Type']:
+        df[col] = df[col].map(normalize_label).astype(object)
+
+    # Replace ALL NaNs (including those we just made) with None for database compatibility
+    df = df.where(pd.notnull(df), None)
+
+    missing_values_count = int(df.isnull().sum().sum())
+
+    # Calculate Summary (Exclude rows where ANY required field is None)
+    clean_df = df.dropna(subset=REQUIRED_COLUMNS)
+    summary = {
+        "total_count": len(df),
+        "valid_count": len(clean_df),
+        "averages": {
+            "flowrate": clean_df['Flowrate'].mean() if not clean_df.empty else 0,
+            "pressure": clean_df['Pressure'].mean() if not clean_df.empty else 0,
+            "temperature": clean_df['Temperature'].mean() if not clean_df.empty else 0
+        },
+        "type_distribution": clean_df['Type'].value_counts().to_dict()
+    }
+
+    return {
+        "rows": list(df[REQUIRED_COLUMNS].itertuples(index=False, name=None)),
+        "missing_values_count": missing_values_count,
+        "summary": summary,
+        "parse_ms": (time.perf_counter() - started) * 1000,
+    }
@@ -2,6 +2,10 @@ from rest_framework import serializers
 from .models import UploadHistory, EquipmentData
 
 class EquipmentDataSerializer(serializers.ModelSerializer):
+    # Interned lookups are exposed as plain strings, as before normalization
+    equipment_name = serializers.SlugRelatedField(slug_field='name', read_only=True)
+    equipment_type = serializers.SlugRelatedField(slug_field='name', read_only=True)
+
     class Meta:
         model = EquipmentData
         fields = '__all__'
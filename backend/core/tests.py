@@ -1,3 +1,467 @@
-from django.test import TestCase
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import LiveServerTestCase, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APITestCase
+
+from .management.commands.loadtest import Client, Recorder, VirtualUser, parse_mix, percentile
+from . import models as models_module
+from .models import UploadHistory, EquipmentData, EquipmentType, EquipmentName
+from .ingest import save_upload, trim_history
+from .parsing import IngestError, normalize_label, parse_equipment_csv
+from .serializers import EquipmentDataSerializer
+from .views import data as data_views
+
+# Wall-clock budget for a cold `import config.wsgi` plus URLconf loading,
+# as reported by `python -X importtime` (sum of per-module self times).
+IMPORT_BUDGET_MS = 600
+
+# Must only be imported by the views that need them, on first use
+LAZY_MODULES = ['pandas', 'numpy', 'reportlab']
+
+
+class StartupImportTimeTests(SimpleTestCase):
+    def _importtime(self):
+        """Import the WSGI app and URLconf in a fresh interpreter, return {module: self_us}."""
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='config.settings')
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import config.wsgi; import config.urls'],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+        modules = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, _cumulative, name = line[len('import time:'):].split('|')
+            modules[name.strip()] = int(self_us)
+        return modules
+
+    def test_heavy_modules_not_imported_at_startup(self):
+        modules = self._importtime()
+        for name in LAZY_MODULES:
+            self.assertNotIn(name, modules, f"{name} is imported at startup")
+
+    def test_startup_import_budget(self):
+        modules = self._importtime()
+        total_ms = sum(modules.values()) / 1000
+        slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:10]
+        self.assertLessEqual(
+            total_ms, IMPORT_BUDGET_MS,
+            f"Startup imports took {total_ms:.0f} ms (budget {IMPORT_BUDGET_MS} ms). "
+            f"Slowest: {', '.join(f'{name} {us / 1000:.0f} ms' for name, us in slowest)}",
+        )
+
+
+class NormalizeLabelTests(SimpleTestCase):
+    def test_strips_and_keeps_real_labels(self):
+        self.assertEqual(normalize_label('  Pump '), 'Pump')
+        self.assertEqual(normalize_label(42), '42')
+
+    def test_sentinels_become_none(self):
+        for value in [None, float('nan'), '', '   ', 'nan', 'NaN', ' NULL ', 'None', 'n/a']:
+            self.assertIsNone(normalize_label(value), repr(value))
+
+
+class LookupInternTests(TestCase):
+    def test_trim_deletes_unused_labels(self):
+        old = save_upload(None, 'old.csv', 'uploads/old.csv', [('P-1', 'Pump', 1, 2, 3), ('Old-9', 'Mixer', 1, 2, 3)])
+        save_upload(None, 'new.csv', 'uploads/new.csv', [('P-1', 'Pump', 1, 2, 3), ('V-1', None, 1, 2, 3)])
+        UploadHistory.objects.filter(id=old.id).update(uploaded_at=old.uploaded_at - timedelta(days=1))
+        trim_history(1)
+        self.assertEqual(sorted(EquipmentName.objects.values_list('name', flat=True)), ['P-1', 'V-1'])
+        self.assertEqual(list(EquipmentType.objects.values_list('name', flat=True)), ['Pump'])
+        self.assertFalse(EquipmentName.objects.search('Old-9').exists())
+
+    def test_str_does_not_query(self):
+        row = EquipmentData.objects.create(upload=UploadHistory.objects.create(filename='a.csv'))
+        with self.assertNumQueries(0):
+            self.assertEqual(str(row), '')
+
+    def test_creates_missing_and_reuses_existing(self):
+        pump = EquipmentType.objects.create(name='Pump')
+        ids = EquipmentType.objects.intern(['Pump', 'Valve', None, 'Valve'])
+        self.assertEqual(set(ids), {'Pump', 'Valve'})
+        self.assertEqual(ids['Pump'], pump.id)
+        self.assertEqual(ids['Valve'], EquipmentType.objects.get(name='Valve').id)
+        self.assertEqual(EquipmentType.objects.count(), 2)
+
+    def test_empty_input(self):
+        self.assertEqual(EquipmentType.objects.intern([None]), {})
+
+    def test_rows_created_concurrently_are_reselected(self):
+        # Another request inserts 'Valve' between our SELECT and bulk INSERT
+        original_bulk_create = EquipmentType.objects.bulk_create
+
+        def racing_bulk_create(objs, **kwargs):
+            EquipmentType.objects.create(name='Valve')
+            return original_bulk_create(objs, **kwargs)
+
+        with mock.patch.object(EquipmentType.objects, 'bulk_create', side_effect=racing_bulk_create):
+            ids = EquipmentType.objects.intern(['Valve', 'Reactor'])
+        self.assertEqual(ids, dict(EquipmentType.objects.values_list('name', 'id')))
+        self.assertEqual(EquipmentType.objects.count(), 2)
+
+    def test_serializer_exposes_labels_as_strings(self):
+        upload = UploadHistory.objects.create(filename='a.csv', file='uploads/a.csv')
+        ids = EquipmentName.objects.intern(['P-1'])
+        row = EquipmentData.objects.create(upload=upload, equipment_name_id=ids['P-1'], flowrate=1.0)
+        data = EquipmentDataSerializer(row).data
+        self.assertEqual(data['equipment_name'], 'P-1')
+        self.assertIsNone(data['equipment_type'])
+
+
+class InternLabelsMigrationTests(TransactionTestCase):
+    before = [('core', '0004_alter_equipmentdata_equipment_type')]
+    after = [('core', '0007_equipmentdata_lookup_fks')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_forward_and_backward(self):
+        apps = self.migrate(self.before)
+        History = apps.get_model('core', 'UploadHistory')
+        Data = apps.get_model('core', 'EquipmentData')
+        upload = History.objects.create(filename='a.csv', file='uploads/a.csv')
+        for name, etype in [('P-1', 'Pump'), ('  P-1 ', ' Pump'), ('nan', 'NaN'), (None, 'Valve'), ('V-1', ''), ('V-2', None),
+                            ('P-1\t', 'Pump\r\n'), ('nan\n', '\tnull')]:
+            Data.objects.create(upload=upload, equipment_name=name, equipment_type=etype)
+
+        apps = self.migrate(self.after)
+        Data = apps.get_model('core', 'EquipmentData')
+        rows = Data.objects.order_by('id')
+        self.assertEqual(
+            [(r.equipment_name and r.equipment_name.name, r.equipment_type and r.equipment_type.name) for r in rows],
+            [('P-1', 'Pump'), ('P-1', 'Pump'), (None, None), (None, 'Valve'), ('V-1', None), ('V-2', None),
+             ('P-1', 'Pump'), (None, None)],
+        )
+        self.assertEqual(sorted(apps.get_model('core', 'EquipmentName').objects.values_list('name', flat=True)), ['P-1', 'V-1', 'V-2'])
+        self.assertEqual(sorted(apps.get_model('core', 'EquipmentType').objects.values_list('name', flat=True)), ['Pump', 'Valve'])
+
+        apps = self.migrate(self.before)
+        Data = apps.get_model('core', 'EquipmentData')
+        self.assertEqual(
+            list(Data.objects.order_by('id').values_list('equipment_name', 'equipment_type')),
+            [('P-1', 'Pump'), ('P-1', 'Pump'), (None, None), (None, 'Valve'), ('V-1', None), ('V-2', None),
+             ('P-1', 'Pump'), (None, None)],
+        )
+
+
+class UploadDataFilterTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create_user('operator'))
+        self.upload = UploadHistory.objects.create(filename='plant.csv', file='uploads/plant.csv')
+        name_ids = EquipmentName.objects.intern(['Pump-A1', 'Pump-B2', 'Valve-C3', 'Reactor-D4'])
+        type_ids = EquipmentType.objects.intern(['Pump', 'Valve', 'Reactor'])
+        rows = [
+            ('Pump-A1', 'Pump', 10.0, 2.0, 300.0),
+            ('Pump-B2', 'Pump', 30.0, 4.0, 310.0),
+            ('Valve-C3', 'Valve', 20.0, None, 290.0),
+            ('Reactor-D4', 'Reactor', 50.0, 8.0, 400.0),
+        ]
+        EquipmentData.objects.bulk_create([
+            EquipmentData(upload=self.upload, equipment_name_id=name_ids[name], equipment_type_id=type_ids[etype],
+                          flowrate=flow, pressure=press, temperature=temp)
+            for name, etype, flow, press, temp in rows
+        ])
+
+    def get_names(self, query):
+        response = self.client.get(f'/api/data/{self.upload.id}/?{query}')
+        self.assertEqual(response.status_code, 200, response.content)
+        return [row['equipment_name'] for row in response.json()['data']]
+
+    def test_no_params_returns_all_rows_with_summary(self):
+        response = self.client.get(f'/api/data/{self.upload.id}/')
+        body = response.json()
+        self.assertEqual(len(body['data']), 4)
+        self.assertEqual(body['summary']['valid_count'], 3)
+        self.assertEqual(body['summary']['type_distribution'], {'Pump': 2, 'Reactor': 1})
+        self.assertNotIn('pagination', body)
+
+    def test_type_and_range_filters(self):
+        self.assertEqual(self.get_names('type=Pump,Valve&flowrate_min=15'), ['Pump-B2', 'Valve-C3'])
+        self.assertEqual(self.get_names('temperature_max=305'), ['Pump-A1', 'Valve-C3'])
+
+    def test_empty_params_are_ignored(self):
+        self.assertEqual(self.get_names('ordering=&type=&flowrate_min=&search='), ['Pump-A1', 'Pump-B2', 'Valve-C3', 'Reactor-D4'])
+
+    def test_missing_only(self):
+        self.assertEqual(self.get_names('missing=true'), ['Valve-C3'])
+
+    def test_ordering(self):
+        self.assertEqual(self.get_names('ordering=-flowrate'), ['Reactor-D4', 'Pump-B2', 'Valve-C3', 'Pump-A1'])
+        self.assertEqual(self.get_names('ordering=equipment_type'), ['Pump-A1', 'Pump-B2', 'Reactor-D4', 'Valve-C3'])
+
+    def test_name_search(self):
+        self.assertEqual(self.get_names('search=ump-'), ['Pump-A1', 'Pump-B2'])
+        # Shorter than a trigram
+        self.assertEqual(self.get_names('search=c3'), ['Valve-C3'])
+
+    def test_search_sees_names_interned_after_migration(self):
+        EquipmentName.objects.intern(['Condenser-E5'])
+        self.assertEqual(list(EquipmentName.objects.search('DENSER').values_list('name', flat=True)), ['Condenser-E5'])
+
+    def test_search_without_fts_table(self):
+        # e.g. a database migrated under SQLite < 3.34, then used with a newer library
+        self.addCleanup(models_module._name_fts_tables.clear)
+        models_module._name_fts_tables.clear()
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TABLE IF EXISTS core_equipmentname_fts')
+        self.assertEqual(self.get_names('search=ump-'), ['Pump-A1', 'Pump-B2'])
+
+    def test_pagination(self):
+        response = self.client.get(f'/api/data/{self.upload.id}/?page=2&page_size=3&summary=false')
+        body = response.json()
+        self.assertEqual([row['equipment_name'] for row in body['data']], ['Reactor-D4'])
+        self.assertEqual(body['pagination'], {'count': 4, 'page': 2, 'page_size': 3, 'num_pages': 2})
+        self.assertNotIn('summary', body)
+
+    def test_invalid_params(self):
+        for query in ['flowrate_min=abc', 'flowrate_min=nan', 'pressure_max=inf', 'temperature_min=-Infinity',
+                      'ordering=color', 'page_size=0']:
+            response = self.client.get(f'/api/data/{self.upload.id}/?{query}')
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('error', response.json())
+
+
+GOOD_CSV = b"Equipment Name,Type,Flowrate,Pressure,Temperature\nP-1,Pump,10,2,300\nV-1,Valve,20,3,310\n"
+MISSING_CSV = b"Equipment Name,Type,Flowrate,Pressure,Temperature\nP-2,Pump,,2,300\n"
+
+
+class BatchUploadTests(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client.force_authenticate(User.objects.create_user('operator'))
+
+    def post_batch(self, files, query=''):
+        return self.client.post(f'/api/upload/batch/{query}', {'files': files}, format='multipart')
+
+    def make_zip(self, members):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            for name, content in members.items():
+                archive.writestr(name, content)
+        return SimpleUploadedFile('exports.zip', buffer.getvalue())
+
+    def test_each_file_is_its_own_upload(self):
+        response = self.post_batch([SimpleUploadedFile('a.csv', GOOD_CSV), SimpleUploadedFile('b.csv', GOOD_CSV)])
+        self.assertEqual(response.status_code, 201)
+        results = response.json()['results']
+        self.assertEqual([r['filename'] for r in results], ['a.csv', 'b.csv'])
+        self.assertTrue(all(r['success'] for r in results))
+        for result in results:
+            self.assertEqual(EquipmentData.objects.filter(upload_id=result['upload_id']).count(), 2)
+            self.assertIn('parse_ms', result)
+            self.assertIn('save_ms', result)
+
+    def test_zip_members_and_per_file_failures(self):
+        archive = self.make_zip({'day/a.csv': GOOD_CSV, 'day/b.csv': MISSING_CSV, '__MACOSX/day/._a.csv': b'', 'readme.txt': b'x'})
+        notes = SimpleUploadedFile('notes.txt', b'x')
+        bad = SimpleUploadedFile('bad.csv', b"a,b\n1,2\n")
+        response = self.post_batch([notes, archive, bad])
+        self.assertEqual(response.status_code, 207)
+        results = response.json()['results']
+        # Results keep the upload order, whichever step a file failed at
+        self.assertEqual([r['filename'] for r in results], ['notes.txt', 'a.csv', 'b.csv', 'bad.csv'])
+        self.assertIn('CSV or a ZIP', results[0]['error'])
+        self.assertTrue(results[1]['success'])
+        self.assertTrue(results[2]['requires_confirmation'])
+        self.assertIn('Missing columns', results[3]['error'])
+        self.assertEqual(UploadHistory.objects.count(), 1)
+
+    def test_parses_in_shared_process_pool(self):
+        self.addCleanup(lambda: data_views._parse_pool and data_views.discard_parse_pool(data_views._parse_pool))
+        with mock.patch('core.views.data.os.cpu_count', return_value=2), \
+                mock.patch('core.views.data.PARALLEL_PARSE_MIN_BYTES', 0):
+            pools = []
+            for _ in range(2):
+                response = self.post_batch(
+                    [SimpleUploadedFile('a.csv', GOOD_CSV), SimpleUploadedFile('b.csv', MISSING_CSV)], '?confirmed=true'
+                )
+                self.assertEqual(response.status_code, 201)
+                self.assertEqual([r['missing_values_count'] for r in response.json()['results']], [0, 1])
+                pools.append(data_views._parse_pool)
+        # Started once, then reused by the next request
+        self.assertIsNotNone(pools[0])
+        self.assertIs(pools[0], pools[1])
+
+    def test_small_batches_parse_inline(self):
+        with mock.patch('core.views.data.os.cpu_count', return_value=2), \
+                mock.patch('core.views.data.get_parse_pool') as get_parse_pool:
+            response = self.post_batch([SimpleUploadedFile('a.csv', GOOD_CSV), SimpleUploadedFile('b.csv', GOOD_CSV)])
+        self.assertEqual(response.status_code, 201)
+        get_parse_pool.assert_not_called()
+
+    def test_batch_keeps_its_own_files_over_history_limit(self):
+        files = [SimpleUploadedFile(f'day{i}.csv', GOOD_CSV) for i in range(7)]
+        response = self.post_batch(files)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(UploadHistory.objects.count(), 7)
+
+    def test_failed_saves_do_not_trim_history(self):
+        for i in range(5):
+            UploadHistory.objects.create(filename=f'old{i}.csv')
+        with mock.patch('core.views.data.save_upload', side_effect=RuntimeError('disk full')):
+            response = self.post_batch([SimpleUploadedFile('a.csv', GOOD_CSV)])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(UploadHistory.objects.count(), 5)
+
+    def test_limits_are_checked_before_reading(self):
+        # Highly compressible member: tiny on the wire, large once inflated
+        archive = self.make_zip({'bomb.csv': GOOD_CSV + b'0' * 100_000})
+        with mock.patch('core.views.data.MAX_FILE_BYTES', 50_000), \
+                mock.patch.object(zipfile.ZipFile, 'read') as read:
+            response = self.post_batch([archive])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('bomb.csv is too large', response.json()['error'])
+        read.assert_not_called()
+
+        archive = self.make_zip({f'day{i}.csv': GOOD_CSV for i in range(3)})
+        with mock.patch('core.views.data.MAX_BATCH_FILES', 2), \
+                mock.patch.object(zipfile.ZipFile, 'read') as read:
+            response = self.post_batch([archive])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Too many files', response.json()['error'])
+        read.assert_not_called()
+
+        with mock.patch('core.views.data.MAX_BATCH_BYTES', len(GOOD_CSV) * 2 - 1):
+            response = self.post_batch([SimpleUploadedFile('a.csv', GOOD_CSV), SimpleUploadedFile('b.csv', GOOD_CSV)])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Batch is too large', response.json()['error'])
+        self.assertEqual(UploadHistory.objects.count(), 0)
+
+    def test_no_files(self):
+        self.assertEqual(self.post_batch([]).status_code, 400)
+
+
+class SpawnParsingTests(SimpleTestCase):
+    def test_parse_in_spawn_worker(self):
+        # Spawned workers start without Django set up, as in BatchUploadView.parse_all
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+            parsed = pool.submit(parse_equipment_csv, GOOD_CSV).result()
+            with self.assertRaises(IngestError):
+                pool.submit(parse_equipment_csv, b"a,b\n1,2\n").result()
+        self.assertEqual(parsed['rows'], [('P-1', 'Pump', 10, 2, 300), ('V-1', 'Valve', 20, 3, 310)])
+
+    def test_parsing_module_does_not_import_django(self):
+        code = "import sys, core.parsing; sys.exit('django' in sys.modules)"
+        result = subprocess.run([sys.executable, '-c', code], cwd=settings.BASE_DIR, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+class LoadTestHelperTests(SimpleTestCase):
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix('history=4, upload=1,report'), {'history': 4, 'upload': 1, 'report': 1})
+        with self.assertRaises(CommandError):
+            parse_mix('history=4,checkout=1')
+        with self.assertRaises(CommandError):
+            parse_mix('history=0')
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([1, 2, 3, 4, 5], 50), 3)
+        self.assertEqual(percentile([1, 2, 3, 4, 5], 90), 5)
+        self.assertEqual(percentile([1, 2, 3], 50), 2)
+        self.assertEqual(percentile([1, 2, 3], 95), 3)
+        self.assertEqual(percentile([10, 20, 30, 40, 50, 60, 70], 50), 40)
+        self.assertEqual(percentile([7], 95), 7)
+        self.assertIsNone(percentile([], 50))
+
+    def make_user(self, mix, responses=((200, b'<html>Server Error</html>'),)):
+        recorder = Recorder()
+        client = Client('http://127.0.0.1:8000/api/', 'operator', 'secret', recorder, timeout=1)
+        client.connect = mock.Mock()
+        responses = [mock.Mock(status=status, **{'read.return_value': body, 'getheader.return_value': 'application/json'})
+                     for status, body in responses]
+        client.connection = mock.Mock(**{'getresponse.side_effect': responses * 50})
+        return recorder, VirtualUser(client, mix, time.monotonic() + 0.05, 0, 10, seed=0)
+
+    def test_report_refreshes_cached_ids(self):
+        recorder, user = self.make_user({'report': 1}, [(200, b'[{"id": 7}]'), (200, b'%PDF-1.4')])
+        user.upload_ids = [99]
+        user.flow_report()
+        paths = [call.args[1] for call in user.client.connection.request.call_args_list]
+        self.assertEqual(paths, ['/api/history/', '/api/report/7/'])
+        self.assertFalse(recorder.errors)
+
+    def test_trimmed_upload_is_stale_not_error(self):
+        recorder, user = self.make_user({'report': 1}, [(200, b'[{"id": 99}]'), (404, b'{"detail": "Not found."}')])
+        user.flow_report()
+        stats = recorder.summarize(1)['endpoints']['report/<id>/']
+        self.assertEqual((stats['requests'], stats['errors'], stats['stale']), (1, 0, 1))
+        self.assertEqual(user.upload_ids, [])
+
+    def test_bad_response_body_is_recorded(self):
+        recorder, user = self.make_user({'history': 1})
+        user.fetch_history()
+        self.assertEqual(recorder.errors['history/'], 1)
+        self.assertIn('JSONDecodeError', next(iter(recorder.error_samples['history/'])))
+        self.assertEqual(recorder.summarize(1)['endpoints']['history/']['requests'], 1)
+
+    def test_crashing_flow_does_not_stop_user(self):
+        recorder, user = self.make_user({'report': 1})
+        user.flow_report = mock.Mock(side_effect=KeyError('id'))
+        user.run()
+        self.assertGreater(user.flow_report.call_count, 1)
+        stats = recorder.summarize(1)['endpoints']['report flow']
+        self.assertEqual(stats['requests'], 0)
+        self.assertEqual(stats['error_samples'], ["KeyError: 'id'"])
+
+
+class LoadTestCommandTests(LiveServerTestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        # Basic auth checks the password on every request: keep that out of the run
+        settings_override = override_settings(MEDIA_ROOT=self.media_root,
+                                              PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        User.objects.create_user('operator', password='secret')
+
+    def test_steps_report_every_endpoint(self):
+        output = os.path.join(self.media_root, 'results.json')
+        call_command('loadtest', url=f'{self.live_server_url}/api/', username='operator', password='secret',
+                     users='1,2', duration=1, upload_rows=20, mix='history=1,dashboard=1,report=1,upload=1',
+                     output=output, stdout=io.StringIO())
+        with open(output) as f:
+            results = json.load(f)
+        self.assertEqual([step['users'] for step in results['steps']], [1, 2])
+        for step in results['steps']:
+            endpoints = step['endpoints']
+            self.assertEqual(set(endpoints), {'history/', 'data/<id>/', 'report/<id>/', 'upload/'})
+            for endpoint, stats in endpoints.items():
+                self.assertGreater(stats['requests'], 0, endpoint)
+                self.assertEqual(stats['error_rate'], 0, (endpoint, stats['error_samples']))
+                self.assertIsNotNone(stats['latency_ms']['p95'], endpoint)
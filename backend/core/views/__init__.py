@@ -0,0 +1,8 @@
+"""
+Views are split by concern so that heavy dependencies stay off the import path:
+pandas/numpy are only loaded by the upload views and reportlab only by the PDF
+report view, each on first use.
+"""
+from .data import FileUploadView, BatchUploadView, HistoryListView, UploadDataView
+from .report import PDFReportView
+from .auth import UserDetailsView, ChangePasswordView
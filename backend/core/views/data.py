@@ -0,0 +1,321 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status, generics
+from django.core.files.base import ContentFile
+from django.db import transaction, models
+from ..models import UploadHistory, EquipmentType
+from ..serializers import UploadHistorySerializer, EquipmentDataSerializer
+from ..filters import filter_equipment, paginate
+from ..ingest import HISTORY_LIMIT, save_upload, trim_history
+from ..parsing import IngestError, parse_equipment_csv
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import ExitStack
+import functools
+import multiprocessing
+import os
+import threading
+import time
+import zipfile
+
+# Batch limits, checked against declared sizes before any file is read or decompressed
+MAX_BATCH_FILES = 50
+MAX_FILE_BYTES = 50 * 1024 * 1024
+MAX_BATCH_BYTES = 200 * 1024 * 1024
+
+# Below this many bytes per batch, parsing inline beats handing files to workers
+PARALLEL_PARSE_MIN_BYTES = 1024 * 1024
+
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
+
+def get_parse_pool():
+    """
+    The process-wide parse pool, started on first use.
+
+    One pool shared by all requests: workers pay the interpreter start and the
+    pandas import once, and concurrent batches never run more than cpu_count
+    workers. spawn rather than the platform default: forking a threaded server
+    copies its locks and DB connections, and spawn workers only import core.parsing.
+    """
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            _parse_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1, mp_context=multiprocessing.get_context('spawn'))
+        return _parse_pool
+
+
+def discard_parse_pool(pool):
+    """Forget a pool whose worker died, so the next batch starts a new one."""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is pool:
+            _parse_pool = None
+    pool.shutdown(wait=False)
+
+class FileUploadView(APIView):
+    def post(self, request, format=None):
+        file_obj = request.FILES.get('file')
+        if not file_obj:
+            return Response({"error": "No file provided"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Basic Check
+        if not file_obj.name.endswith('.csv'):
+             return Response({"error": "File must be a CSV"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            parsed = parse_equipment_csv(file_obj.read())
+            missing_values_count = parsed['missing_values_count']
+            confirmed = request.query_params.get('confirmed', 'false').lower() == 'true'
+
+            if missing_values_count > 0 and not confirmed:
+                return Response({
+                    "error": f"Found {missing_values_count} missing values. Please confirm upload.",
+                    "missing_values_count": missing_values_count,
+                    "requires_confirmation": True
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            with transaction.atomic():
+                # Manage History Limit (Keep last 5, including this one)
+                trim_history(HISTORY_LIMIT - 1)
+                history = save_upload(
+                    request.user if request.user.is_authenticated else None,
+                    file_obj.name,
+                    file_obj,
+                    parsed['rows']
+                )
+
+            return Response({
+                "message": "File processed successfully",
+                "upload_id": history.id,
+                "summary": parsed['summary'],
+                "missing_values_count": missing_values_count
+            }, status=status.HTTP_201_CREATED)
+
+        except IngestError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class BatchUploadView(APIView):
+    """
+    Upload many CSVs at once, as several `files` parts and/or ZIP archives of CSVs.
+
+    Large batches are parsed in parallel in a shared process pool, then each file
+    is saved as its own UploadHistory entry. The response lists every file with
+    its own outcome and timings: 201 if all succeeded, 207 if some failed, 400 if
+    none succeeded.
+    """
+
+    def post(self, request, format=None):
+        started = time.perf_counter()
+        file_objs = request.FILES.getlist('files')
+        if not file_objs:
+            return Response({"error": "No files provided"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            results, pending = self.collect_files(file_objs)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        confirmed = request.query_params.get('confirmed', 'false').lower() == 'true'
+        parsed_files = []
+        for (result, content), outcome in zip(pending, self.parse_all([content for _, content in pending])):
+            if isinstance(outcome, Exception):
+                result.update(success=False, error=str(outcome))
+            else:
+                result.update(missing_values_count=outcome['missing_values_count'], parse_ms=round(outcome['parse_ms'], 1))
+                if outcome['missing_values_count'] > 0 and not confirmed:
+                    result.update(
+                        success=False,
+                        error=f"Found {outcome['missing_values_count']} missing values. Please confirm upload.",
+                        requires_confirmation=True
+                    )
+                else:
+                    parsed_files.append((result, content, outcome))
+
+        user = request.user if request.user.is_authenticated else None
+        saved = 0
+        for result, content, parsed in parsed_files:
+            save_started = time.perf_counter()
+            try:
+                history = save_upload(user, result['filename'], ContentFile(content, name=result['filename']), parsed['rows'])
+            except Exception as e:
+                result.update(success=False, error=str(e))
+            else:
+                result.update(success=True, upload_id=history.id, summary=parsed['summary'])
+                saved += 1
+            result['save_ms'] = round((time.perf_counter() - save_started) * 1000, 1)
+
+        # Manage History Limit once the batch is saved, so failed files never push
+        # out older uploads and the files saved by this batch are all kept
+        if saved:
+            trim_history(max(HISTORY_LIMIT, saved))
+
+        if saved == len(results):
+            response_status = status.HTTP_201_CREATED
+        elif saved:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+
+        return Response({
+            "message": f"Processed {len(results)} files: {saved} succeeded, {len(results) - saved} failed",
+            "results": results,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        }, status=response_status)
+
+    def collect_files(self, file_objs):
+        """
+        Expand ZIPs into their CSV members and read them.
+
+        Returns (results, pending): one result dict per file in upload order, and
+        (result, bytes) pairs for the files still to parse. Count and sizes are
+        checked from the upload sizes and ZIP headers before anything is read;
+        raises ValueError if the batch is over MAX_BATCH_FILES, MAX_FILE_BYTES or
+        MAX_BATCH_BYTES.
+        """
+        results, sources = [], []
+        with ExitStack() as archives:
+            for file_obj in file_objs:
+                name = file_obj.name
+                if name.lower().endswith('.csv'):
+                    result = {"filename": name}
+                    results.append(result)
+                    sources.append((result, file_obj.size, file_obj.read))
+                elif name.lower().endswith('.zip'):
+                    try:
+                        archive = archives.enter_context(zipfile.ZipFile(file_obj))
+                    except zipfile.BadZipFile:
+                        results.append({"filename": name, "success": False, "error": "Invalid ZIP archive"})
+                        continue
+                    for member in archive.infolist():
+                        member_name = os.path.basename(member.filename)
+                        # Skip directories and macOS resource forks
+                        if member.is_dir() or member.filename.startswith('__MACOSX/') or member_name.startswith('.'):
+                            continue
+                        if member_name.lower().endswith('.csv'):
+                            result = {"filename": member_name}
+                            results.append(result)
+                            # zipfile never inflates a member past its declared file_size
+                            sources.append((result, member.file_size, functools.partial(archive.read, member)))
+                else:
+                    results.append({"filename": name, "success": False, "error": "File must be a CSV or a ZIP of CSVs"})
+
+            if len(sources) > MAX_BATCH_FILES:
+                raise ValueError(f"Too many files. Maximum per batch: {MAX_BATCH_FILES}")
+            for result, size, _ in sources:
+                if size > MAX_FILE_BYTES:
+                    raise ValueError(f"{result['filename']} is too large. Maximum per file: {MAX_FILE_BYTES // (1024 * 1024)} MB")
+            if sum(size for _, size, _ in sources) > MAX_BATCH_BYTES:
+                raise ValueError(f"Batch is too large. Maximum per batch: {MAX_BATCH_BYTES // (1024 * 1024)} MB")
+
+            pending = []
+            for result, _, read in sources:
+                try:
+                    pending.append((result, read()))
+                except Exception as e:
+                    result.update(success=False, error=f"Could not read file: {e}")
+        return results, pending
+
+    def parse_all(self, contents):
+        """Parse every file, in the shared worker pool for large batches; errors are returned, not raised."""
+        if len(contents) <= 1 or (os.cpu_count() or 1) <= 1 or sum(map(len, contents)) < PARALLEL_PARSE_MIN_BYTES:
+            outcomes = []
+            for content in contents:
+                try:
+                    outcomes.append(parse_equipment_csv(content))
+                except Exception as e:
+                    outcomes.append(e)
+            return outcomes
+
+        pool = get_parse_pool()
+        try:
+            futures = [pool.submit(parse_equipment_csv, content) for content in contents]
+        except BrokenProcessPool:
+            # A worker died after the previous batch; start over once with a fresh pool
+            discard_parse_pool(pool)
+            pool = get_parse_pool()
+            futures = [pool.submit(parse_equipment_csv, content) for content in contents]
+        outcomes = []
+        for future in futures:
+            try:
+                outcomes.append(future.result())
+            except BrokenProcessPool as e:
+                discard_parse_pool(pool)
+                outcomes.append(e)
+            except Exception as e:
+                outcomes.append(e)
+        return outcomes
+
+class HistoryListView(generics.ListAPIView):
+    queryset = UploadHistory.objects.all().order_by('-uploaded_at')
+    serializer_class = UploadHistorySerializer
+
+class UploadDataView(APIView):
+    def get(self, request, upload_id):
+        try:
+            upload = UploadHistory.objects.get(id=upload_id)
+            data = upload.equipment_data.select_related('equipment_name', 'equipment_type').order_by('id')
+
+            # Filtering/sorting/search happen in SQL; paging only when asked for,
+            # so clients that expect every row keep working
+            try:
+                rows = filter_equipment(data, request.query_params)
+                pagination = None
+                if 'page' in request.query_params or 'page_size' in request.query_params:
+                    rows, pagination = paginate(rows, request.query_params)
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            serializer = EquipmentDataSerializer(rows, many=True)
+
+            response_data = {
+                "upload": UploadHistorySerializer(upload).data,
+                "data": serializer.data,
+            }
+            # The summary covers the whole upload and scans every row; table paging
+            # requests pass summary=false to skip it
+            if request.query_params.get('summary', 'true').lower() != 'false':
+                response_data["summary"] = self.get_summary(data)
+            if pagination is not None:
+                response_data["pagination"] = pagination
+            return Response(response_data)
+
+        except UploadHistory.DoesNotExist:
+             return Response({"error": "Upload not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    def get_summary(self, data):
+        # Re-calculate summary for frontend convenience if needed, 
+        # effectively we can just aggregate from DB or re-read file if we stored it (we did).
+        # But querying DB is safer.
+        
+        total_count = data.count()
+        
+        # Filter for valid rows only (Exclude nulls in ANY field)
+        clean_data = data.exclude(equipment_name__isnull=True).exclude(equipment_type__isnull=True).exclude(flowrate__isnull=True).exclude(pressure__isnull=True).exclude(temperature__isnull=True)
+
+        # Count and averages in a single pass
+        stats = clean_data.aggregate(
+            valid_count=models.Count('id'),
+            avg_flow=models.Avg('flowrate'),
+            avg_press=models.Avg('pressure'),
+            avg_temp=models.Avg('temperature'),
+        )
+        
+        # Type distribution (Valid rows only)
+        # Group by the integer type id, then resolve the handful of ids to names
+        type_dist = dict(clean_data.values_list('equipment_type').annotate(count=models.Count('id')).order_by())
+        type_names = dict(EquipmentType.objects.filter(id__in=type_dist).values_list('id', 'name'))
+        dist_dict = {type_names[type_id]: count for type_id, count in type_dist.items()}
+
+        return {
+            "total_count": total_count,
+            "valid_count": stats['valid_count'],
+            "averages": {
+                "flowrate": stats['avg_flow'] or 0,
+                "pressure": stats['avg_press'] or 0,
+                "temperature": stats['avg_temp'] or 0
+            },
+            "type_distribution": dist_dict
+        }
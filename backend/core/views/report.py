@@ -0,0 +1,191 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from django.db import models
+from django.http import HttpResponse
+from ..models import UploadHistory
+
+class PDFReportView(APIView):
+    def get(self, request, upload_id):
+        # The reportlab stack is only loaded once a report is requested
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.units import inch
+        from reportlab.lib.enums import TA_CENTER
+
+        try:
+            try:
+                upload = UploadHistory.objects.get(id=upload_id)
+            except UploadHistory.DoesNotExist:
+                return Response({"error": "Upload not found"}, status=status.HTTP_404_NOT_FOUND)
+
+            data = upload.equipment_data.select_related('equipment_name', 'equipment_type').order_by('id')
+            
+            response = HttpResponse(content_type='application/pdf')
+            filename = f"Report_{upload.filename}_{upload.uploaded_at.strftime('%Y%m%d')}.pdf"
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+
+            doc = SimpleDocTemplate(response, pagesize=letter)
+            elements = []
+            styles = getSampleStyleSheet()
+            
+            # --- Styles ---
+            title_style = ParagraphStyle(
+                'CustomTitle',
+                parent=styles['Heading1'],
+                fontSize=24,
+                leading=28,
+                spaceAfter=10,
+                textColor=colors.HexColor('#0f766e'), # Teal-700
+                alignment=TA_CENTER
+            )
+            subtitle_style = ParagraphStyle(
+                'CustomSubtitle',
+                parent=styles['Normal'],
+                fontSize=12,
+                textColor=colors.HexColor('#64748b'), # Slate-500
+                alignment=TA_CENTER,
+                spaceAfter=30
+            )
+            
+            # --- Header ---
+            elements.append(Paragraph("Chem.Viz Analytics Report", title_style))
+            elements.append(Paragraph(f"File: {upload.filename} | Generated: {upload.uploaded_at.strftime('%Y-%m-%d %H:%M')}", subtitle_style))
+            elements.append(Spacer(1, 0.2 * inch))
+
+            # --- Summary Section ---
+            # Re-calculate clean stats for report
+            # NaN sentinels are stored as real NULLs, so excluding NULLs is enough
+            clean_data = data.exclude(equipment_name__isnull=True)\
+                             .exclude(equipment_type__isnull=True)\
+                             .exclude(flowrate__isnull=True)\
+                             .exclude(pressure__isnull=True)\
+                             .exclude(temperature__isnull=True)
+            
+            total_count = data.count()
+            valid_count = clean_data.count()
+            missing_count = total_count - valid_count
+            
+            # --- Warning Section ---
+            if missing_count > 0:
+                warning_style = ParagraphStyle(
+                    'WarningStyle',
+                    parent=styles['Normal'],
+                    fontSize=10,
+                    textColor=colors.HexColor('#991b1b'), # Red-800
+                    backColor=colors.HexColor('#fee2e2'), # Red-100
+                    borderColor=colors.HexColor('#f87171'), # Red-400
+                    borderWidth=1,
+                    borderPadding=10,
+                    spaceAfter=20,
+                    alignment=TA_CENTER
+                )
+                warning_text = f"<b>⚠️ WARNING:</b> This report excludes <b>{missing_count}</b> rows containing missing values (nulls or empty fields).<br/>These rows are highlighted in red in the data table below."
+                elements.append(Paragraph(warning_text, warning_style))
+
+            
+            avg_flow = clean_data.aggregate(models.Avg('flowrate'))['flowrate__avg'] or 0
+            avg_press = clean_data.aggregate(models.Avg('pressure'))['pressure__avg'] or 0
+            avg_temp = clean_data.aggregate(models.Avg('temperature'))['temperature__avg'] or 0
+            
+            summary_data = [
+                ['Total Records', 'Valid Records', 'Avg Flow', 'Avg Press', 'Avg Temp'],
+                [str(total_count), str(valid_count), f"{avg_flow:.2f}", f"{avg_press:.2f}", f"{avg_temp:.2f}"]
+            ]
+            
+            # FIT TO PAGE: 8.5 width - 2 inch margins = 6.5 inch max
+            # Summary: 1.3 * 5 = 6.5 inches
+            t_summary = Table(summary_data, colWidths=[1.3*inch, 1.3*inch, 1.3*inch, 1.3*inch, 1.3*inch])
+            t_summary.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f0fdfa')), # Teal-50
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#0f766e')), # Teal-700
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 9),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+                ('TOPPADDING', (0, 0), (-1, 0), 8),
+                ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#ccfbf1')), # Teal-100
+                ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#0d9488')), # Teal-600
+                ('ROUNDEDCORNERS', [10, 10, 10, 10])
+            ]))
+            elements.append(t_summary)
+            elements.append(Spacer(1, 0.5 * inch))
+
+            # --- Main Data Table ---
+            table_data = [['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temp']]
+            
+            # Limit rows for PDF performance if needed, or implement pagination (SimpleDocTemplate handles pagination automatically)
+            row_styles = []
+            for i, item in enumerate(data):
+                is_null_row = False
+                
+                # Check Name and Type
+                if item.equipment_name is None: is_null_row = True
+                name_str = item.equipment_name.name[:30] if item.equipment_name is not None else "N/A"
+                
+                if item.equipment_type is None: is_null_row = True
+                type_str = item.equipment_type.name if item.equipment_type is not None else "N/A"
+                
+                if item.flowrate is None: is_null_row = True
+                flow = f"{item.flowrate:.2f}" if item.flowrate is not None else "N/A"
+                
+                if item.pressure is None: is_null_row = True
+                press = f"{item.pressure:.2f}" if item.pressure is not None else "N/A"
+                
+                if item.temperature is None: is_null_row = True
+                temp = f"{item.temperature:.2f}" if item.temperature is not None else "N/A"
+
+                table_data.append([
+                    name_str,
+                    type_str,
+                    flow,
+                    press,
+                    temp
+                ])
+                
+                # Check for nulls and add style
+                if is_null_row:
+                    # i + 1 because row 0 is header
+                    row_styles.append(('BACKGROUND', (0, i+1), (-1, i+1), colors.HexColor('#fee2e2'))) # Red-100 for warning
+
+            # FIT TO PAGE: 2.0 + 1.2 + 1.0 + 1.0 + 1.0 = 6.2 inches
+            t = Table(table_data, colWidths=[2.0*inch, 1.2*inch, 1*inch, 1*inch, 1*inch], repeatRows=1)
+            t_style = TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#0f766e')), # Teal-700 Header
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('ALIGN', (0, 1), (0, -1), 'LEFT'), # Left align names
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 10),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+                ('TOPPADDING', (0, 0), (-1, 0), 10),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e2e8f0')), # Slate-200
+            ])
+            
+            # Apply dynamic row styles
+            for style in row_styles:
+                t_style.add(*style)
+                
+            t.setStyle(t_style)
+            
+            elements.append(t)
+            
+            # Build PDF
+            def add_footer(canvas, doc):
+                canvas.saveState()
+                canvas.setFont('Helvetica', 9)
+                canvas.drawString(inch, 0.75 * inch, f"Page {doc.page}")
+                canvas.drawRightString(7.5 * inch, 0.75 * inch, "Chem.Viz Automated Report")
+                canvas.restoreState()
+
+            doc.build(elements, onFirstPage=add_footer, onLaterPages=add_footer)
+            return response
+
+        except Exception as e:
+            import traceback
+            tb = traceback.format_exc()
+            print(f"PDF GENERATION ERROR: {tb}")
+            return Response({"error": f"PDF Generation Error: {str(e)}", "traceback": tb}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)